@@ -1,87 +1,142 @@
 import os
 import json
-import yaml
-import markdown
-import requests
 import sys
-from flask import Flask, render_template, jsonify, send_from_directory, abort
-from datetime import datetime
-import jinja2
-import shutil
+import threading
 import time
-from datetime import timedelta
-import calendar
+from datetime import datetime, timedelta, timezone
 
-app = Flask(__name__)
+# 注意：Flask、requests、markdown、jinja2 等较重的依赖均在使用处延迟导入，
+# 这样 `python app.py generate_static` 和 worker 冷启动只需加载真正用到的子系统
+
+# 项目根目录（替代 app.root_path，避免为取路径而创建 Flask 实例）
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # 全局配置变量
 config = None
 
-# 修复：Flask 2.0+ 已废弃 before_first_request，改用 before_request + 判空
-@app.before_request
+# 延迟创建的 Flask 实例（通过模块级 __getattr__ 暴露为 app）
+_app = None
+
+# 应用工厂：导入 Flask 并注册钩子和路由
+def create_app():
+    from flask import Flask
+
+    app = Flask(__name__)
+    # 修复：Flask 2.0+ 已废弃 before_first_request，改用 before_request + 判空
+    app.before_request(load_config)
+    app.add_url_rule('/', 'index', index)
+    app.add_url_rule('/api/config', 'get_config', get_config)
+    app.add_url_rule('/api/profile', 'get_profile', get_profile)
+    app.add_url_rule('/<path:filename>', 'serve_root_file', serve_root_file)
+
+    # 可选：慢请求采样分析（设置环境变量 PROFILE_SLOW_MS 为阈值毫秒数）
+    profile_slow_ms = os.environ.get('PROFILE_SLOW_MS')
+    if profile_slow_ms:
+        import loadtest
+        loadtest.install_profiler(app, float(profile_slow_ms))
+    return app
+
+# 兼容 `from app import app`、gunicorn `app:app` 和 build_static.py 的 hasattr(app_module, 'app')
+def __getattr__(name):
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Markdown 渲染（首次调用时才导入 markdown）
+def render_markdown(text):
+    import markdown
+    return markdown.markdown(text)
+
+# 配置、缓存等全局状态会被多个请求线程同时读写，修改时需持有对应的锁
+config_lock = threading.Lock()
+
 def load_config():
     global config
     if config is not None:
         return  # 已加载过配置，直接返回
-    try:
-        with open('config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
-    except FileNotFoundError:
-        # 如果config.json不存在，尝试从default文件夹复制
-        default_config_path = os.path.join('default', 'default_config.json')
-        if os.path.exists(default_config_path):
-            print(f"config.json不存在，从{default_config_path}复制默认配置")
-            shutil.copy2(default_config_path, 'config.json')
-            # 读取复制过来的配置
+    import shutil
+    with config_lock:
+        if config is not None:
+            return  # 其他线程已完成加载
+        try:
             with open('config.json', 'r', encoding='utf-8') as f:
                 config = json.load(f)
+        except FileNotFoundError:
+            # 如果config.json不存在，尝试从default文件夹复制
+            default_config_path = os.path.join('default', 'default_config.json')
+            if os.path.exists(default_config_path):
+                print(f"config.json不存在，从{default_config_path}复制默认配置")
+                shutil.copy2(default_config_path, 'config.json')
+                # 读取复制过来的配置
+                with open('config.json', 'r', encoding='utf-8') as f:
+                    config = json.load(f)
             
-            # 同时检查background.jpg是否存在，如果不存在也从default文件夹复制
-            if 'background' in config and 'image' in config['background']:
-                background_image = config['background']['image']
-                if not os.path.exists(background_image) and os.path.exists(os.path.join('default', background_image)):
-                    print(f"{background_image}不存在，从default文件夹复制")
-                    shutil.copy2(os.path.join('default', background_image), background_image)
-        else:
-            # 如果default_config.json也不存在，使用内置默认配置
-            print("default/default_config.json不存在，使用内置默认配置")
-            config = {
-                "github_url": "https://github.com/cicadaas-design",  # 改为你的GitHub地址
-                "dark_mode": "auto",
-                "name": "cicadaas",
-                "bio": "数学建模爱好者，Python编程爱好者，AI技术爱好者",
-                "introduction_file": "Introduction.md",
-                "github_token": "",  # 可选：填写你的GitHub令牌（ghp_xxx）
-                "theme": {
-                    "primary_color": "#333333",
-                    "secondary_color": "#555555",
-                    "dark_primary_color": "#222222",
-                    "dark_secondary_color": "#444444"
-                },
-                "background": {
-                    "image": "background.jpg",
-                    "blur": 8,
-                    "overlay_opacity": 0.9,
-                    "overlay_color": "#ffffff"
+                # 同时检查background.jpg是否存在，如果不存在也从default文件夹复制
+                if 'background' in config and 'image' in config['background']:
+                    background_image = config['background']['image']
+                    if not os.path.exists(background_image) and os.path.exists(os.path.join('default', background_image)):
+                        print(f"{background_image}不存在，从default文件夹复制")
+                        shutil.copy2(os.path.join('default', background_image), background_image)
+            else:
+                # 如果default_config.json也不存在，使用内置默认配置
+                print("default/default_config.json不存在，使用内置默认配置")
+                config = {
+                    "github_url": "https://github.com/cicadaas-design",  # 改为你的GitHub地址
+                    "dark_mode": "auto",
+                    "name": "cicadaas",
+                    "bio": "数学建模爱好者，Python编程爱好者，AI技术爱好者",
+                    "introduction_file": "Introduction.md",
+                    "github_token": "",  # 可选：填写你的GitHub令牌（ghp_xxx）
+                    "theme": {
+                        "primary_color": "#333333",
+                        "secondary_color": "#555555",
+                        "dark_primary_color": "#222222",
+                        "dark_secondary_color": "#444444"
+                    },
+                    "background": {
+                        "image": "background.jpg",
+                        "blur": 8,
+                        "overlay_opacity": 0.9,
+                        "overlay_color": "#ffffff"
+                    }
                 }
-            }
-            # 保存默认配置
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+                # 保存默认配置
+                with open('config.json', 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
+
+# 复用连接的 requests 会话（首次请求时创建）
+github_session = None
+github_session_lock = threading.Lock()
 
-# 创建通用的GitHub API请求函数
-def make_github_request(url, timeout=5):
+def get_github_session():
+    global github_session
+    if github_session is not None:
+        return github_session
+    with github_session_lock:
+        if github_session is None:
+            import ssl
+            import requests
+            # 配置不验证SSL证书（解决本地环境中的证书验证问题），只需在创建会话时设置一次
+            ssl._create_default_https_context = ssl._create_unverified_context
+            session = requests.Session()
+            session.verify = False
+            github_session = session
+    return github_session
+
+# 创建通用的GitHub API请求函数（extra_headers 用于 If-None-Match 等条件请求头）
+def make_github_request(url, timeout=5, extra_headers=None):
     try:
-        # 配置requests不验证SSL证书（解决本地环境中的证书验证问题）
-        import ssl
-        ssl._create_default_https_context = ssl._create_unverified_context
-        
         # 准备请求头
         headers = {'Accept': 'application/vnd.github.v3+json'}
+        if extra_headers:
+            headers.update(extra_headers)
         github_token = ''
         
         # 首先尝试从github_token.txt文件中读取令牌
-        token_file = os.path.join(app.root_path, 'github_token.txt')
+        token_file = os.path.join(BASE_DIR, 'github_token.txt')
         try:
             if os.path.exists(token_file):
                 with open(token_file, 'r', encoding='utf-8') as f:
@@ -106,7 +161,7 @@ def make_github_request(url, timeout=5):
             print("未使用GitHub令牌，使用匿名访问")
         
         # 发送请求
-        response = requests.get(url, headers=headers, timeout=timeout, verify=False)
+        response = get_github_session().get(url, headers=headers, timeout=timeout)
         print(f"GitHub API请求: {url}, 状态码: {response.status_code}")
         
         # 检查是否达到速率限制
@@ -121,13 +176,182 @@ def make_github_request(url, timeout=5):
             def __init__(self):
                 self.status_code = 500
                 self.text = "模拟错误响应"
+                self.headers = {}
         return MockResponse()
 
+# ========== 精简的用户资料快照 ==========
+# GitHub 返回的仓库对象有约 90 个字段，模板和 API 只用到其中几个；
+# 快照只保存这些字段，并用 __slots__ 去掉每个实例的 __dict__
+
+# 快照格式版本（字段增删时递增，旧版本的磁盘缓存会被忽略）
+SNAPSHOT_VERSION = 1
+# 快照磁盘缓存目录
+SNAPSHOT_DIR = os.path.join(BASE_DIR, '.cache', 'snapshots')
+
+# 只带 __slots__ 的轻量记录基类（不使用 dataclasses，避免导入时加载 inspect 并生成代码）
+class SlotsRecord:
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{slot}={getattr(self, slot)!r}' for slot in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+class RepoSummary(SlotsRecord):
+    __slots__ = ('name', 'description', 'html_url', 'language', 'stargazers_count', 'forks_count')
+
+    def __init__(self, name, description, html_url, language, stargazers_count, forks_count):
+        self.name = name
+        self.description = description
+        self.html_url = html_url
+        self.language = language
+        self.stargazers_count = stargazers_count
+        self.forks_count = forks_count
+
+    @classmethod
+    def from_github(cls, repo):
+        return cls(repo.get('name', ''), repo.get('description') or '', repo.get('html_url', ''),
+                   repo.get('language') or '', repo.get('stargazers_count', 0), repo.get('forks_count', 0))
+
+class TechItem(SlotsRecord):
+    __slots__ = ('name', 'color')
+
+    def __init__(self, name, color):
+        self.name = name
+        self.color = color
+
+class ProfileSnapshot(SlotsRecord):
+    __slots__ = ('avatar_url', 'name', 'bio', 'total_repos', 'total_stars', 'readme_content',
+                 'recent_repos', 'activity_data', 'tech_stack', 'fetched_at')
+
+    # fetched_at 为 0 表示兜底数据，不写入缓存
+    # recent_repos、activity_data、tech_stack 保持为列表：模板中直接输出 {{ github_info.activity_data }}
+    # 时会得到 JS 数组字面量 [..]，元组则会渲染成 (..) 导致图表脚本出错
+    def __init__(self, avatar_url, name, bio, total_repos, total_stars, readme_content,
+                 recent_repos, activity_data, tech_stack, fetched_at):
+        self.avatar_url = avatar_url
+        self.name = name
+        self.bio = bio
+        self.total_repos = total_repos
+        self.total_stars = total_stars
+        self.readme_content = readme_content
+        self.recent_repos = recent_repos
+        self.activity_data = activity_data
+        self.tech_stack = tech_stack
+        self.fetched_at = fetched_at
+
+    # 紧凑的位置数组形式：[版本, 标量字段..., 仓库行, 活动数据, 技术栈行]
+    def pack(self):
+        return [SNAPSHOT_VERSION, self.avatar_url, self.name, self.bio, self.total_repos, self.total_stars,
+                self.readme_content,
+                [[r.name, r.description, r.html_url, r.language, r.stargazers_count, r.forks_count]
+                 for r in self.recent_repos],
+                list(self.activity_data),
+                [[t.name, t.color] for t in self.tech_stack],
+                self.fetched_at]
+
+    @classmethod
+    def unpack(cls, row):
+        if not row or row[0] != SNAPSHOT_VERSION:
+            return None
+        _, avatar_url, name, bio, total_repos, total_stars, readme_content, repos, activity, tech, fetched_at = row
+        return cls(avatar_url, name, bio, total_repos, total_stars, readme_content,
+                   [RepoSummary(*r) for r in repos], list(activity),
+                   [TechItem(*t) for t in tech], fetched_at)
+
+    # 转为普通字典（供 JSON 接口使用）
+    def to_dict(self):
+        return {
+            "avatar_url": self.avatar_url,
+            "name": self.name,
+            "bio": self.bio,
+            "total_repos": self.total_repos,
+            "total_stars": self.total_stars,
+            "readme_content": self.readme_content,
+            "recent_repos": [{slot: getattr(r, slot) for slot in RepoSummary.__slots__} for r in self.recent_repos],
+            "activity_data": list(self.activity_data),
+            "tech_stack": [{"name": t.name, "color": t.color} for t in self.tech_stack],
+        }
+
+def make_tech_stack(items):
+    return [TechItem(item['name'], item['color']) for item in items]
+
+# 内存中的快照缓存：{用户名: ProfileSnapshot}
+cached_snapshots = {}
+# 刷新快照（及其中的提交索引、磁盘写入）的锁
+refresh_lock = threading.Lock()
+
+def snapshot_path(username):
+    return os.path.join(SNAPSHOT_DIR, f'{username}.json')
+
+def save_snapshot(username, snapshot):
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_path = snapshot_path(username) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot.pack(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, snapshot_path(username))
+    except Exception as e:
+        print(f"保存资料快照失败: {e}")
+
+def load_snapshot(username):
+    try:
+        with open(snapshot_path(username), 'r', encoding='utf-8') as f:
+            return ProfileSnapshot.unpack(json.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"读取资料快照失败: {e}")
+        return None
+
+def get_github_username():
+    github_url = config.get('github_url', 'https://github.com/example')
+    return github_url.rstrip('/').split('/')[-1]
+
+# 获取用户资料快照（内存 -> 磁盘 -> GitHub API）
+def get_cached_snapshot(username):
+    snapshot = cached_snapshots.get(username)
+    if snapshot is None:
+        snapshot = load_snapshot(username)
+        if snapshot is not None:
+            cached_snapshots[username] = snapshot
+    return snapshot
+
+def get_profile_snapshot():
+    username = get_github_username()
+    snapshot = get_cached_snapshot(username)
+    if snapshot is not None and time.time() - snapshot.fetched_at < CACHE_DURATION:
+        return snapshot
+
+    # 同一时间只允许一个线程刷新：手里已有过期快照的请求不排队，直接返回旧快照；
+    # 完全没有快照的请求才等待正在进行的刷新
+    if snapshot is not None:
+        if not refresh_lock.acquire(blocking=False):
+            return snapshot
+    else:
+        refresh_lock.acquire()
+    try:
+        snapshot = get_cached_snapshot(username)
+        if snapshot is not None and time.time() - snapshot.fetched_at < CACHE_DURATION:
+            return snapshot
+
+        fresh = get_github_user_info()
+        if fresh.fetched_at:
+            cached_snapshots[username] = fresh
+            save_snapshot(username, fresh)
+            return fresh
+    finally:
+        refresh_lock.release()
+    # 获取失败时优先使用过期的快照，其次才是兜底数据
+    return snapshot or fresh
+
 # 从 GitHub API 获取用户信息
 def get_github_user_info():
     print("开始获取GitHub用户信息")
     github_url = config.get('github_url', 'https://github.com/example')
-    username = github_url.rstrip('/').split('/')[-1]
+    username = get_github_username()
     print(f"配置的GitHub URL: {github_url}")
     print(f"提取的用户名: {username}")
 
@@ -147,6 +371,19 @@ def get_github_user_info():
             if repos_response.status_code == 200:
                 repos = repos_response.json()
 
+                # 仓库超过100个时继续翻页，保证提交索引能覆盖全部仓库
+                public_repos = user_data.get('public_repos', 0)
+                page = 2
+                while len(repos) < public_repos and page <= MAX_REPO_PAGES:
+                    page_response = make_github_request(f'https://api.github.com/users/{username}/repos?sort=pushed&per_page=100&page={page}')
+                    if page_response.status_code != 200:
+                        break
+                    page_repos = page_response.json()
+                    if not page_repos:
+                        break
+                    repos.extend(page_repos)
+                    page += 1
+
                 # 获取总仓库数和总 stars 数
                 total_repos = len(repos)
                 total_stars = sum(repo.get('stargazers_count', 0) for repo in repos)
@@ -163,39 +400,230 @@ def get_github_user_info():
                 # 分析用户的技术栈
                 tech_stack = analyze_tech_stack(repos)
 
-                return {
-                    "avatar_url": user_data.get('avatar_url'),
-                    "name": user_data.get('name') or username,
-                    "bio": config.get('bio', 'Python Developer'),  # 使用配置文件中的bio
-                    "total_repos": total_repos,
-                    "total_stars": total_stars,
-                    "readme_content": readme_content,
-                    "recent_repos": recent_repos,
-                    "activity_data": activity_data,
-                    "tech_stack": tech_stack
-                }
+                return ProfileSnapshot(
+                    avatar_url=user_data.get('avatar_url') or '',
+                    name=user_data.get('name') or username,
+                    bio=config.get('bio', 'Python Developer'),  # 使用配置文件中的bio
+                    total_repos=total_repos,
+                    total_stars=total_stars,
+                    readme_content=readme_content,
+                    recent_repos=[RepoSummary.from_github(repo) for repo in recent_repos],
+                    activity_data=list(activity_data),
+                    tech_stack=make_tech_stack(tech_stack),
+                    fetched_at=time.time()
+                )
     except Exception as e:
         print(f"GitHub API调用异常: {type(e).__name__}: {str(e)}")
         import traceback
         traceback.print_exc()
     
     # 如果获取失败，返回默认值
-    return {
-        "avatar_url": "https://avatars.githubusercontent.com/u/142971357?v=4",
-        "name": config.get('name', 'cicadaas'),
-        "bio": config.get('bio', '数学建模爱好者，Python编程爱好者，AI技术爱好者'),
-        "total_repos": 0,
-        "total_stars": 0,
-        "readme_content": get_local_readme(),
-        "recent_repos": [],
-        "activity_data": [65, 59, 80, 81, 56, 55, 70, 65, 85, 75, 60, 75],  # 默认数据
-        "tech_stack": [
+    return ProfileSnapshot(
+        avatar_url="https://avatars.githubusercontent.com/u/142971357?v=4",
+        name=config.get('name', 'cicadaas'),
+        bio=config.get('bio', '数学建模爱好者，Python编程爱好者，AI技术爱好者'),
+        total_repos=0,
+        total_stars=0,
+        readme_content=get_local_readme(),
+        recent_repos=[],
+        activity_data=[65, 59, 80, 81, 56, 55, 70, 65, 85, 75, 60, 75],  # 默认数据
+        tech_stack=make_tech_stack([
             {"name": "Python", "color": "#333333"},
             {"name": "数学建模", "color": "#555555"},
             {"name": "HTML/CSS", "color": "#222222"},
             {"name": "Flask", "color": "#444444"}
-        ]
-    }
+        ]),
+        fetched_at=0
+    )
+
+# ========== 提交活动索引 ==========
+# 按仓库持久化每周提交数，每次刷新只在 API 预算内扫描有新推送的仓库，
+# 从上次停下的位置轮转继续，覆盖范围随刷新次数增长而单次成本不变
+
+# 仓库列表最多翻页数（每页100个）
+MAX_REPO_PAGES = 10
+# 每次刷新用于扫描提交历史的默认 API 请求数（可在 config.json 中用 commit_scan_budget 覆盖）
+COMMIT_SCAN_BUDGET = 10
+# 提交索引的格式版本（2：只统计用户本人的提交，旧索引混有其他作者的提交，需重建）
+COMMIT_INDEX_VERSION = 2
+# 提交索引磁盘目录
+COMMIT_INDEX_DIR = os.path.join(BASE_DIR, '.cache', 'commit_activity')
+
+def commit_index_path(username):
+    return os.path.join(COMMIT_INDEX_DIR, f'{username}.json')
+
+def load_commit_index(username):
+    try:
+        with open(commit_index_path(username), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == COMMIT_INDEX_VERSION:
+            return index
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"读取提交索引失败: {e}")
+    return {"version": COMMIT_INDEX_VERSION, "cursor": 0, "repos": {}, "pending": {}}
+
+def save_commit_index(username, index):
+    try:
+        os.makedirs(COMMIT_INDEX_DIR, exist_ok=True)
+        tmp_path = commit_index_path(username) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, commit_index_path(username))
+    except Exception as e:
+        print(f"保存提交索引失败: {e}")
+
+# 日期所在周的起始时间戳（周日 00:00 UTC，与 stats/contributors 的 w 字段一致）
+def week_start_timestamp(date):
+    week_start = date - timedelta(days=(date.weekday() + 1) % 7)
+    week_start = datetime(week_start.year, week_start.month, week_start.day, tzinfo=timezone.utc)
+    return int(week_start.timestamp())
+
+# 通过 stats/contributors 获取用户本人的每周提交数，返回 (每周计数, 花费的请求数)
+# 只取用户自己的那条统计，与提交列表的 author={username} 口径一致，不计入协作者的提交
+# GitHub 正在计算统计数据时返回202，此时返回 None 由调用方改用提交列表
+def fetch_weekly_stats(username, repo_name):
+    response = make_github_request(f'https://api.github.com/repos/{username}/{repo_name}/stats/contributors')
+    if response.status_code == 204:
+        return {}, 1  # 空仓库
+    if response.status_code != 200:
+        return None, 1
+    weeks = {}
+    for contributor in response.json() or []:
+        author = contributor.get('author') or {}
+        if (author.get('login') or '').lower() != username.lower():
+            continue
+        for week in contributor.get('weeks', []):
+            if week.get('c'):
+                weeks[str(week['w'])] = week['c']
+    return weeks, 1
+
+# 分页统计 [since, until) 内用户本人的每周提交数，进度保存在 progress 中：
+# {"pushed_at", "since", "until", "page", "weeks"}，until 固定为开始扫描的时间，翻页期间的新提交不会打乱页码
+# 返回 (状态, 花费的请求数)：'done' 已翻完，'partial' 预算用完（下一轮从 progress['page'] 继续），'error' 请求失败
+def fetch_weekly_commits(username, repo_name, progress, budget):
+    weeks = progress['weeks']
+    spent = 0
+    while spent < budget:
+        commits_url = (f"https://api.github.com/repos/{username}/{repo_name}/commits"
+                       f"?author={username}&since={progress['since']}&until={progress['until']}"
+                       f"&per_page=100&page={progress['page']}")
+        commits_response = make_github_request(commits_url)
+        spent += 1
+        if commits_response.status_code == 409:
+            return 'done', spent  # 空仓库
+        if commits_response.status_code != 200:
+            return 'error', spent
+        commits = commits_response.json()
+        for commit in commits:
+            commit_date = datetime.strptime(commit['commit']['author']['date'], '%Y-%m-%dT%H:%M:%SZ')
+            key = str(week_start_timestamp(commit_date))
+            weeks[key] = weeks.get(key, 0) + 1
+        if len(commits) < 100:
+            return 'done', spent
+        progress['page'] += 1
+    return 'partial', spent
+
+# 在预算内更新提交索引，返回更新后的索引
+def update_commit_index(username, repos, budget=None):
+    if budget is None:
+        budget = config.get('commit_scan_budget', COMMIT_SCAN_BUDGET)
+    index = load_commit_index(username)
+    indexed = index['repos']
+    # 尚未翻完提交列表的仓库：{仓库名: progress}
+    pending = index.setdefault('pending', {})
+
+    # 只索引自己的非 fork 仓库，并移除已不存在的仓库
+    candidates = sorted((repo for repo in repos if not repo.get('fork')), key=lambda repo: repo['name'])
+    names = {repo['name'] for repo in candidates}
+    for table in (indexed, pending):
+        for name in [name for name in table if name not in names]:
+            del table[name]
+    if not candidates:
+        save_commit_index(username, index)
+        return index
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    now_str = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+    one_year_ago = now - timedelta(days=365)
+    oldest_week = week_start_timestamp(one_year_ago)
+    start = index.get('cursor', 0) % len(candidates)
+    scanned = 0
+    stopped_at = start
+
+    for offset in range(len(candidates)):
+        position = (start + offset) % len(candidates)
+        repo = candidates[position]
+        entry = indexed.get(repo['name'])
+        progress = pending.get(repo['name'])
+        pushed_at = repo.get('pushed_at') or ''
+        # 上次扫描后没有新推送、也没有未完成翻页的仓库无需请求
+        if entry and entry.get('pushed_at') == pushed_at and progress is None:
+            continue
+        if budget <= 0:
+            stopped_at = position
+            break
+
+        weeks = None
+        scanned_at = now_str
+        if progress is None:
+            weeks, spent = fetch_weekly_stats(username, repo['name'])
+            budget -= spent
+            if weeks is None:
+                # 增量扫描：只请求上次扫描之后的提交
+                progress = pending[repo['name']] = {
+                    "pushed_at": pushed_at,
+                    "since": entry['scanned_at'] if entry else one_year_ago.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    "until": now_str,
+                    "page": 1,
+                    "weeks": {}
+                }
+        if weeks is None:
+            if budget <= 0:
+                stopped_at = position
+                break
+            status, spent = fetch_weekly_commits(username, repo['name'], progress, budget)
+            budget -= spent
+            if status == 'partial':
+                # 预算用完，翻页进度已保存，下一轮从这个仓库的下一页继续
+                stopped_at = position
+                break
+            if status == 'error':
+                # 请求失败时保留进度并跳过，后续轮次再重试，不阻塞其他仓库
+                continue
+            del pending[repo['name']]
+            weeks = dict(entry['weeks']) if entry else {}
+            for key, count in progress['weeks'].items():
+                weeks[key] = weeks.get(key, 0) + count
+            pushed_at = progress['pushed_at']
+            scanned_at = progress['until']
+
+        indexed[repo['name']] = {
+            "pushed_at": pushed_at,
+            "scanned_at": scanned_at,
+            "weeks": {key: count for key, count in weeks.items() if int(key) >= oldest_week}
+        }
+        scanned += 1
+        stopped_at = (position + 1) % len(candidates)
+
+    index['cursor'] = stopped_at
+    print(f"提交索引已更新: 本轮扫描 {scanned} 个仓库, 已索引 {len(indexed)}/{len(candidates)} 个仓库")
+    save_commit_index(username, index)
+    return index
+
+# 计算日期距今的月数（0 表示本月内）
+def months_ago(now, date):
+    years_diff = now.year - date.year
+    months_diff = now.month - date.month
+    
+    if now.day < date.day:
+        months_diff -= 1
+        if months_diff < 0:
+            years_diff -= 1
+            months_diff = 11
+    
+    return years_diff * 12 + months_diff
 
 # 获取用户的GitHub活动数据（过去12个月的推送统计）
 def get_github_activity_data(username, repos=None):
@@ -234,54 +662,26 @@ def get_github_activity_data(username, repos=None):
                     
                     if event_date >= earliest_date:
                         page_has_recent_events = True
-                        years_diff = now.year - event_date.year
-                        months_diff = now.month - event_date.month
-                        
-                        if now.day < event_date.day:
-                            months_diff -= 1
-                            if months_diff < 0:
-                                years_diff -= 1
-                                months_diff = 11
-                        
-                        total_months_diff = years_diff * 12 + months_diff
+                        total_months_diff = months_ago(now, event_date)
                         if 0 <= total_months_diff < 12:
                             activity_counts[total_months_diff] += 1
             
             page += 1
         
-        # 2. 使用仓库提交历史作为补充
+        # 2. 使用提交索引（覆盖全部仓库的每周提交数）作为补充
         if repos and len(repos) > 0:
             print("使用仓库提交历史作为补充数据")
-            if len(repos) > 5:
-                repos = repos[:5]
-            
-            for repo in repos:
-                try:
-                    commits_url = f"https://api.github.com/repos/{username}/{repo['name']}/commits?author={username}&per_page=100"
-                    commits_response = make_github_request(commits_url)
-                    
-                    if commits_response.status_code == 200:
-                        commits = commits_response.json()
-                        for commit in commits:
-                            commit_date_str = commit['commit']['author']['date']
-                            commit_date = datetime.strptime(commit_date_str, '%Y-%m-%dT%H:%M:%SZ')
-                            
-                            if commit_date >= earliest_date:
-                                years_diff = now.year - commit_date.year
-                                months_diff = now.month - commit_date.month
-                                
-                                if now.day < commit_date.day:
-                                    months_diff -= 1
-                                    if months_diff < 0:
-                                        years_diff -= 1
-                                        months_diff = 11
-                                
-                                total_months_diff = years_diff * 12 + months_diff
-                                if 0 <= total_months_diff < 12:
-                                    activity_counts[total_months_diff] += 1
-                except Exception as e:
-                    print(f"获取仓库 {repo['name']} 的提交历史时出错: {e}")
-                    continue
+            try:
+                commit_index = update_commit_index(username, repos)
+                for entry in commit_index['repos'].values():
+                    for week, count in entry['weeks'].items():
+                        week_date = datetime.fromtimestamp(int(week), timezone.utc).replace(tzinfo=None)
+                        if week_date >= earliest_date:
+                            total_months_diff = months_ago(now, week_date)
+                            if 0 <= total_months_diff < 12:
+                                activity_counts[total_months_diff] += count
+            except Exception as e:
+                print(f"更新提交索引时出错: {e}")
         
         # 3. 调整数据顺序（从最旧到最新）
         ordered_activity = []
@@ -328,8 +728,16 @@ def get_github_activity_data(username, repos=None):
 # 分析用户的技术栈（带缓存）
 cached_tech_stack = None
 cached_timestamp = 0
+tech_stack_lock = threading.Lock()
 CACHE_DURATION = 3600  # 缓存1小时
+
+# 整个分析过程持有锁：缓存过期时只有一个线程请求语言数据，其余线程等待后复用结果；
+# analyze_tech_stack_locked 只能在持有 tech_stack_lock 时调用
 def analyze_tech_stack(repos):
+    with tech_stack_lock:
+        return analyze_tech_stack_locked(repos)
+
+def analyze_tech_stack_locked(repos):
     global cached_tech_stack, cached_timestamp
     current_time = time.time()
     if cached_tech_stack and (current_time - cached_timestamp < CACHE_DURATION):
@@ -455,30 +863,79 @@ def analyze_tech_stack(repos):
             {"name": "Flask", "color": "#444444"}
         ]
 
+# README 缓存目录（保存 ETag、blob SHA 和渲染后的 HTML）
+README_CACHE_DIR = os.path.join(BASE_DIR, '.cache', 'readme')
+# 内存中的 README 缓存：{用户名: {"etag": ..., "sha": ..., "html": ...}}
+cached_readmes = {}
+
+def readme_cache_path(username):
+    return os.path.join(README_CACHE_DIR, f'{username}.json')
+
+def load_readme_cache(username):
+    entry = cached_readmes.get(username)
+    if entry is not None:
+        return entry
+    try:
+        with open(readme_cache_path(username), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        # 文件被截断或手动修改时字段可能不全，视为没有缓存
+        if not isinstance(entry, dict) or not all(isinstance(entry.get(key), str) for key in ('etag', 'sha', 'html')):
+            print("README缓存格式无效，已忽略")
+            return None
+        cached_readmes[username] = entry
+        return entry
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"读取README缓存失败: {e}")
+        return None
+
+def save_readme_cache(username, entry):
+    cached_readmes[username] = entry
+    try:
+        os.makedirs(README_CACHE_DIR, exist_ok=True)
+        tmp_path = readme_cache_path(username) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, readme_cache_path(username))
+    except Exception as e:
+        print(f"保存README缓存失败: {e}")
+
 # 获取GitHub仓库README
+# 通过 repos/{user}/{user}/readme 接口自动解析默认分支和文件名；
+# 带上次的 ETag 做条件请求，内容未变时返回304，渲染结果按 blob SHA 复用
 def get_readme_content(username):
+    cached = load_readme_cache(username)
     try:
         print(f"尝试获取GitHub同名仓库README: {username}/{username}")
-        import ssl
-        ssl._create_default_https_context = ssl._create_unverified_context
-        
-        # 尝试main分支
-        readme_url_main = f'https://raw.githubusercontent.com/{username}/{username}/main/README.md'
-        readme_response = requests.get(readme_url_main, timeout=5, verify=False)
-        if readme_response.status_code == 200:
-            print("成功获取main分支的README")
-            return markdown.markdown(readme_response.text)
+        extra_headers = {'If-None-Match': cached['etag']} if cached and cached.get('etag') else None
+        readme_response = make_github_request(f'https://api.github.com/repos/{username}/{username}/readme',
+                                              extra_headers=extra_headers)
+        if readme_response.status_code == 304 and cached:
+            print("README未变化，使用缓存")
+            return cached['html']
         
-        # 尝试master分支
-        readme_url_master = f'https://raw.githubusercontent.com/{username}/{username}/master/README.md'
-        readme_response = requests.get(readme_url_master, timeout=5, verify=False)
         if readme_response.status_code == 200:
-            print("成功获取master分支的README")
-            return markdown.markdown(readme_response.text)
+            readme_data = readme_response.json()
+            sha = readme_data.get('sha', '')
+            if cached and cached.get('sha') == sha:
+                html = cached['html']
+            else:
+                import base64
+                print(f"成功获取README: {readme_data.get('path')}")
+                text = base64.b64decode(readme_data.get('content', '')).decode('utf-8')
+                html = render_markdown(text)
+            save_readme_cache(username, {"etag": readme_response.headers.get('ETag', ''), "sha": sha, "html": html})
+            return html
         
         print(f"GitHub README获取失败，状态码: {readme_response.status_code}")
+        # 请求失败（非404）时优先使用上次的缓存
+        if cached and readme_response.status_code != 404:
+            return cached['html']
     except Exception as e:
         print(f"GitHub README获取异常: {type(e).__name__}: {str(e)}")
+        if cached:
+            return cached['html']
     
     # 读取本地README
     print("使用本地README文件")
@@ -490,17 +947,35 @@ def get_local_readme():
         introduction_file = config.get('introduction_file', 'Introduction.md')
         if os.path.exists(introduction_file):
             with open(introduction_file, 'r', encoding='utf-8') as f:
-                return markdown.markdown(f.read())
+                return render_markdown(f.read())
     except Exception:
         pass
     return "<p>欢迎访问我的个人主页！我是一名数学建模爱好者、Python编程爱好者和AI技术爱好者～</p>"
 
-# 主页路由
-@app.route('/')
-def index():
-    github_info = get_github_user_info()
-    
-    # 检查背景图片
+# 延迟解析的资料快照：模板第一次读取 github_info 的属性时才获取数据，
+# 在此之前渲染出的 head、样式、配置中的个人信息和背景可以先发送给浏览器
+class LazyProfileSnapshot:
+    __slots__ = ('_snapshot',)
+
+    def __init__(self):
+        self._snapshot = None
+
+    def __getattr__(self, name):
+        if self._snapshot is None:
+            self._snapshot = get_profile_snapshot()
+        return getattr(self._snapshot, name)
+
+# 是否使用流式渲染（config.json 中的 stream_render，或请求参数 ?stream=1/0）
+def is_stream_render():
+    from flask import request
+
+    stream_param = request.args.get('stream')
+    if stream_param is not None:
+        return stream_param not in ('0', 'false', '')
+    return bool(config.get('stream_render', False))
+
+# 检查背景图片，返回 (是否存在, 页面中使用的路径)
+def get_background_info():
     background_image = config.get('background', {}).get('image', 'background.jpg')
     possible_paths = [
         os.path.join(os.getcwd(), background_image),
@@ -517,21 +992,94 @@ def index():
             break
     
     print(f"背景图片配置: {background_image}, 存在: {background_exists}")
-    return render_template('index.html', 
-                          github_info=github_info, 
-                          config=config,
-                          now=datetime.now(),
-                          background_exists=background_exists,
-                          background_path=background_path)
+    return background_exists, background_path
+
+# 主页路由
+def index():
+    from flask import render_template
+
+    background_exists, background_path = get_background_info()
+    stream = is_stream_render()
+    context = {
+        'github_info': LazyProfileSnapshot() if stream else get_profile_snapshot(),
+        'config': config,
+        'now': datetime.now(),
+        'background_exists': background_exists,
+        'background_path': background_path
+    }
+    if not stream:
+        return render_template('index.html', **context)
+
+    # 流式渲染：逐块发送模板输出，首字节不必等待 GitHub 数据
+    from flask import current_app, stream_with_context, Response
+
+    current_app.update_template_context(context)
+    template = current_app.jinja_env.get_template('index.html')
+    response = Response(stream_with_context(template.generate(**context)), mimetype='text/html')
+    # 避免 nginx 等反向代理缓冲整个响应
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# 不允许通过 API 返回的配置项
+SECRET_CONFIG_KEYS = {'github_token'}
 
 # 配置API
-@app.route('/api/config')
 def get_config():
-    return jsonify(config)
+    from flask import jsonify
+    return jsonify({key: value for key, value in config.items() if key not in SECRET_CONFIG_KEYS})
+
+# /api/profile 可选择的字段
+PROFILE_FIELDS = tuple(field for field in ProfileSnapshot.__slots__ if field != 'fetched_at')
+
+# 预序列化的资料 JSON：{(用户名, 快照时间, 字段元组): (ETag, 字节内容)}
+profile_json_cache = {}
+profile_json_lock = threading.Lock()
+
+def get_profile_json(username, snapshot, fields):
+    key = (username, snapshot.fetched_at, fields)
+    entry = profile_json_cache.get(key)
+    if entry is not None:
+        return entry
+
+    import hashlib
+
+    data = snapshot.to_dict()
+    body = json.dumps({field: data[field] for field in fields}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    entry = (hashlib.sha1(body).hexdigest(), body)
+    # 兜底数据（fetched_at 为 0）每次都可能不同，不做缓存
+    if snapshot.fetched_at:
+        with profile_json_lock:
+            # 快照更新后丢弃该用户旧版本的序列化结果
+            for old_key in [k for k in profile_json_cache if k[0] == username and k[1] != snapshot.fetched_at]:
+                del profile_json_cache[old_key]
+            profile_json_cache[key] = entry
+    return entry
+
+# 资料API（支持 ?fields=name,total_stars 字段选择和 ETag 条件请求）
+def get_profile():
+    from flask import request, jsonify, Response
+
+    fields = PROFILE_FIELDS
+    # 未指定或只有分隔符/空白（如 ?fields=,）时返回全部字段
+    requested = {field.strip() for field in request.args.get('fields', '').split(',') if field.strip()}
+    if requested:
+        unknown_fields = sorted(requested.difference(PROFILE_FIELDS))
+        if unknown_fields:
+            return jsonify({"error": f"未知字段: {', '.join(unknown_fields)}", "fields": list(PROFILE_FIELDS)}), 400
+        # 按固定顺序排列，使相同的字段集合共享同一份缓存
+        fields = tuple(field for field in PROFILE_FIELDS if field in requested)
+
+    etag, body = get_profile_json(get_github_username(), get_profile_snapshot(), fields)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # 客户端可缓存，但每次使用前需用 If-None-Match 重新验证
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 # 静态文件访问
-@app.route('/<path:filename>')
 def serve_root_file(filename):
+    from flask import send_from_directory, abort
+
     allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.svg', '.css', '.js'}
     file_ext = os.path.splitext(filename)[1].lower()
     
@@ -544,8 +1092,11 @@ def serve_root_file(filename):
 
 # 生成静态HTML（用于GitHub Pages部署）
 def generate_static_html():
+    import shutil
+    import jinja2
+
     print("开始生成静态HTML文件...")
-    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_build')
+    static_dir = os.path.join(BASE_DIR, 'static_build')
     if not os.path.exists(static_dir):
         os.makedirs(static_dir)
     else:
@@ -589,12 +1140,12 @@ def generate_static_html():
             try:
                 with open(config['introduction_file'], 'r', encoding='utf-8') as f:
                     introduction_content = f.read()
-                introduction_content = markdown.markdown(introduction_content)
+                introduction_content = render_markdown(introduction_content)
             except Exception as e:
                 print(f"警告：无法读取或解析介绍文件: {e}")
         
         # 渲染模板
-        template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+        template_dir = os.path.join(BASE_DIR, 'templates')
         env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(template_dir),
             autoescape=jinja2.select_autoescape(['html', 'xml'])
@@ -602,7 +1153,7 @@ def generate_static_html():
         template = env.get_template('index.html')
         
         # 获取GitHub信息
-        github_info = get_github_user_info()
+        github_info = get_profile_snapshot()
         
         render_args = {
             'config': config,
@@ -655,6 +1206,9 @@ def generate_static_html():
 if __name__ == '__main__':
     if len(sys.argv) > 1 and sys.argv[1] == 'generate_static':
         generate_static_html()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'loadtest':
+        import loadtest
+        sys.exit(loadtest.main(sys.argv[2:], sys.modules[__name__]))
     else:
         os.environ['FLASK_APP'] = 'app.py'
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        create_app().run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+压力测试与性能分析脚本
+在进程内用 Flask 测试客户端按目标 RPS 并发请求各个路由（GitHub API 使用本地固定数据代替），
+统计延迟分位数和错误率；可选开启慢请求采样分析，输出可直接用于火焰图的折叠栈文件
+
+用法：
+    python loadtest.py --rps 50 --duration 10
+    python app.py loadtest --rps 100 --backend-latency 200 --cache-duration 0 --profile-slow-ms 100
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PATHS = ['/', '/api/profile', '/api/config', '/background.jpg']
+
+# ========== 本地固定数据的 GitHub 后端 ==========
+
+# 模拟的 GitHub API 延迟（秒）
+backend_latency = 0.0
+
+class FixtureResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+        self.text = json.dumps(data)
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+def fixture_repos(username, count=30):
+    return [{
+        "name": f"repo-{i}",
+        "description": f"fixture repository {i}",
+        "html_url": f"https://github.com/{username}/repo-{i}",
+        "language": ["Python", "JavaScript", "HTML", "Shell"][i % 4],
+        "languages_url": f"https://api.github.com/repos/{username}/repo-{i}/languages",
+        "stargazers_count": i,
+        "forks_count": i // 3,
+        "fork": i % 10 == 9,
+        "pushed_at": f"2026-{i % 12 + 1:02d}-01T00:00:00Z",
+    } for i in range(count)]
+
+FIXTURE_README = "# Fixture README\n\n本地压测使用的固定 README 内容。\n"
+FIXTURE_README_ETAG = '"fixture-readme"'
+
+# 与 make_github_request 签名一致，按 URL 返回固定数据
+def fixture_github_request(url, timeout=5, extra_headers=None):
+    if backend_latency:
+        time.sleep(backend_latency)
+    path = url.split('api.github.com', 1)[-1].split('?', 1)[0]
+    parts = path.strip('/').split('/')
+    if parts[0] == 'users' and len(parts) == 2:
+        return FixtureResponse(200, {"login": parts[1], "name": parts[1], "public_repos": 30,
+                                     "avatar_url": "https://avatars.githubusercontent.com/u/0?v=4"})
+    if parts[0] == 'users' and parts[2:] == ['repos']:
+        return FixtureResponse(200, fixture_repos(parts[1]))
+    if parts[0] == 'users' and parts[2:] == ['events']:
+        page = 1
+        if 'page=' in url:
+            page = int(url.split('page=', 1)[1].split('&', 1)[0])
+        if page > 1:
+            return FixtureResponse(200, [])
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        return FixtureResponse(200, [{"type": "PushEvent", "created_at": now}] * 20)
+    if parts[0] == 'repos' and parts[-1] == 'readme':
+        if (extra_headers or {}).get('If-None-Match') == FIXTURE_README_ETAG:
+            return FixtureResponse(304, {})
+        import base64
+        response = FixtureResponse(200, {"path": "README.md", "sha": "fixture-sha",
+                                         "content": base64.b64encode(FIXTURE_README.encode('utf-8')).decode('ascii')})
+        response.headers = {'ETag': FIXTURE_README_ETAG}
+        return response
+    if parts[0] == 'repos' and parts[-1] == 'languages':
+        return FixtureResponse(200, {"Python": 12000, "HTML": 3000, "CSS": 1000})
+    if parts[0] == 'repos' and parts[-2:] == ['stats', 'contributors']:
+        week = int(time.time()) // 604800 * 604800
+        return FixtureResponse(200, [
+            {"author": {"login": parts[1]}, "total": 104,
+             "weeks": [{"w": week - 604800 * i, "a": 0, "d": 0, "c": i % 5} for i in range(52)]},
+            {"author": {"login": "collaborator"}, "total": 520,
+             "weeks": [{"w": week - 604800 * i, "a": 0, "d": 0, "c": 10} for i in range(52)]},
+        ])
+    return FixtureResponse(404, {"message": "Not Found"})
+
+# 替换 app 模块的 GitHub 访问，并把磁盘缓存指向临时目录
+def install_fixture_backend(app_module, latency_ms=0):
+    global backend_latency
+    backend_latency = latency_ms / 1000.0
+    app_module.make_github_request = fixture_github_request
+    cache_dir = tempfile.mkdtemp(prefix='loadtest-cache-')
+    app_module.SNAPSHOT_DIR = os.path.join(cache_dir, 'snapshots')
+    app_module.COMMIT_INDEX_DIR = os.path.join(cache_dir, 'commit_activity')
+    app_module.README_CACHE_DIR = os.path.join(cache_dir, 'readme')
+    print(f"已启用固定数据的GitHub后端（延迟 {latency_ms}ms），缓存目录: {cache_dir}")
+
+# ========== 慢请求采样分析 ==========
+
+# 统计式采样器：后台线程定时抓取正在处理请求的线程的调用栈，
+# 请求耗时超过阈值时把采样结果写成折叠栈格式（可用 flamegraph.pl / speedscope 打开）
+class SlowRequestSampler:
+    def __init__(self, threshold_ms, interval_ms=5, output_dir='profiles'):
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.output_dir = output_dir
+        self.active = {}  # {线程ID: Counter(折叠栈 -> 次数)}
+        self.lock = threading.Lock()
+        self.dumped = 0
+        thread = threading.Thread(target=self.run, name='slow-request-sampler', daemon=True)
+        thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, samples in self.active.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    samples[';'.join(reversed(stack))] += 1
+
+    def start_request(self):
+        with self.lock:
+            self.active[threading.get_ident()] = Counter()
+
+    def finish_request(self, path, elapsed):
+        with self.lock:
+            samples = self.active.pop(threading.get_ident(), None)
+        if not samples or elapsed < self.threshold:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = path.strip('/').replace('/', '_') or 'index'
+        file_path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms-{name}.folded")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.items():
+                f.write(f"{stack} {count}\n")
+        self.dumped += 1
+        print(f"慢请求 {path} 耗时 {elapsed * 1000:.0f}ms，采样栈已保存到: {file_path}")
+
+# 为 Flask 实例注册慢请求采样钩子（每个实例只安装一次，重复调用返回已有的采样器）
+def install_profiler(app, threshold_ms, interval_ms=5, output_dir=None):
+    from flask import g, request
+
+    sampler = app.extensions.get('slow_request_sampler')
+    if sampler is not None:
+        print(f"慢请求采样分析已启用（阈值 {sampler.threshold * 1000:.0f}ms），忽略重复安装")
+        return sampler
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'profiles')
+    sampler = app.extensions['slow_request_sampler'] = SlowRequestSampler(threshold_ms, interval_ms, output_dir)
+
+    @app.before_request
+    def start_sampling():
+        g.profile_start = time.perf_counter()
+        sampler.start_request()
+
+    @app.teardown_request
+    def finish_sampling(exc=None):
+        start = g.pop('profile_start', None)
+        if start is not None:
+            sampler.finish_request(request.path, time.perf_counter() - start)
+
+    print(f"已启用慢请求采样分析（阈值 {threshold_ms}ms，采样间隔 {interval_ms}ms），输出目录: {output_dir}")
+    return sampler
+
+# ========== 负载生成 ==========
+
+# 最近秩法计算分位数
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+# 按固定间隔（开环）发送请求；延迟从计划发送时间算起，排队等待也计入延迟
+def run_load(app, paths, rps, duration, concurrency):
+    local = threading.local()
+    results = []  # (路径, 状态码, 延迟秒数)
+    results_lock = threading.Lock()
+
+    def send(path, scheduled):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        try:
+            status = client.get(path).status_code
+        except Exception as e:
+            print(f"请求 {path} 异常: {type(e).__name__}: {e}")
+            status = 0
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((path, status, latency))
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, paths[i % len(paths)], scheduled)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def print_report(results, elapsed):
+    if not results:
+        print("\n没有发送任何请求（rps × duration 不足 1），请调大参数")
+        return 0.0
+    print(f"\n共 {len(results)} 个请求，用时 {elapsed:.2f}s，实际吞吐 {len(results) / max(elapsed, 1e-9):.1f} req/s")
+    print(f"{'路径':<20}{'请求数':>8}{'错误率':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    by_path = {}
+    for path, status, latency in results:
+        by_path.setdefault(path, []).append((status, latency))
+    by_path['全部'] = [(status, latency) for _, status, latency in results]
+    for path, rows in by_path.items():
+        if not rows:
+            continue
+        latencies = sorted(latency * 1000 for _, latency in rows)
+        errors = sum(1 for status, _ in rows if status == 0 or status >= 500)
+        print(f"{path:<20}{len(rows):>8}{errors / len(rows):>9.1%}"
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 90):>9.1f}"
+              f"{percentile(latencies, 99):>9.1f}{latencies[-1]:>9.1f}")
+    statuses = Counter(status for _, status, _ in results)
+    print(f"状态码分布: {dict(sorted(statuses.items()))}")
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+    return errors / len(results)
+
+def main(argv=None, app_module=None):
+    parser = argparse.ArgumentParser(description='个人主页压力测试与慢请求采样分析')
+    parser.add_argument('--rps', type=float, default=50, help='目标每秒请求数')
+    parser.add_argument('--duration', type=float, default=10, help='持续时间（秒）')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发线程数')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS, help='轮流请求的路径')
+    parser.add_argument('--backend-latency', type=float, default=0, help='模拟的 GitHub API 延迟（毫秒）')
+    parser.add_argument('--cache-duration', type=float, default=None, help='覆盖 CACHE_DURATION（秒），0 表示每次都刷新')
+    parser.add_argument('--profile-slow-ms', type=float, default=None, help='耗时超过该值的请求保存采样栈')
+    parser.add_argument('--profile-interval-ms', type=float, default=5, help='采样间隔（毫秒）')
+    parser.add_argument('--profile-dir', default=None, help='采样栈输出目录')
+    parser.add_argument('--max-error-rate', type=float, default=None, help='错误率超过该值时以非零状态退出')
+    args = parser.parse_args(argv)
+
+    if app_module is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        os.chdir(here)
+        sys.path.insert(0, here)
+        import app as app_module
+
+    install_fixture_backend(app_module, args.backend_latency)
+    if args.cache_duration is not None:
+        app_module.CACHE_DURATION = args.cache_duration
+    app = app_module.create_app()
+    if args.profile_slow_ms is not None:
+        install_profiler(app, args.profile_slow_ms, args.profile_interval_ms, args.profile_dir)
+
+    print(f"开始压测: {args.rps} req/s × {args.duration}s，并发 {args.concurrency}，路径 {args.paths}")
+    results, elapsed = run_load(app, args.paths, args.rps, args.duration, args.concurrency)
+    error_rate = print_report(results, elapsed)
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        print(f"错误率 {error_rate:.1%} 超过上限 {args.max_error_rate:.1%}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
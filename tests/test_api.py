@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 接口测试：/api/profile 的字段选择、ETag 条件请求，以及 /api/config 不泄露令牌
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('flask')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+SNAPSHOT = app.ProfileSnapshot(
+    avatar_url="https://avatars.githubusercontent.com/u/0?v=4",
+    name="fixture",
+    bio="bio",
+    total_repos=2,
+    total_stars=7,
+    readme_content="<p>readme</p>",
+    recent_repos=[app.RepoSummary('repo', 'desc', 'https://github.com/fixture-user/repo', 'Python', 7, 1)],
+    activity_data=[1] * 12,
+    tech_stack=[app.TechItem('Python', '#333333')],
+    fetched_at=1000.0
+)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, 'config', {"github_url": "https://github.com/fixture-user",
+                                        "name": "fixture",
+                                        "github_token": "ghp_secret"})
+    monkeypatch.setattr(app, 'profile_json_cache', {})
+    monkeypatch.setattr(app, 'get_profile_snapshot', lambda: SNAPSHOT)
+    return app.create_app().test_client()
+
+def test_profile_returns_all_fields(client):
+    response = client.get('/api/profile')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert sorted(data) == sorted(app.PROFILE_FIELDS)
+    assert data['recent_repos'][0]['stargazers_count'] == 7
+    assert 'fetched_at' not in data
+
+def test_profile_field_projection(client):
+    response = client.get('/api/profile?fields=total_stars, name')
+    assert response.status_code == 200
+    assert response.get_json() == {"name": "fixture", "total_stars": 7}
+
+@pytest.mark.parametrize('fields', [',', ' , ', ''])
+def test_profile_empty_selection_returns_all_fields(client, fields):
+    response = client.get(f'/api/profile?fields={fields}')
+    assert response.status_code == 200
+    assert sorted(response.get_json()) == sorted(app.PROFILE_FIELDS)
+
+def test_profile_unknown_field_rejected(client):
+    response = client.get('/api/profile?fields=name,github_token')
+    assert response.status_code == 400
+    data = response.get_json()
+    assert 'github_token' in data['error']
+    assert data['fields'] == list(app.PROFILE_FIELDS)
+
+def test_profile_etag_and_304(client):
+    response = client.get('/api/profile?fields=name')
+    etag = response.headers['ETag']
+    assert not etag.startswith('W/')
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    cached = client.get('/api/profile?fields=name', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    # 不同的字段集合对应不同的 ETag
+    other = client.get('/api/profile?fields=total_stars', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+    assert other.headers['ETag'] != etag
+
+def test_config_hides_github_token(client):
+    response = client.get('/api/config')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert 'github_token' not in data
+    assert data['name'] == 'fixture'
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+共享缓存的线程安全压力测试：大量线程同时访问技术栈、资料快照和预序列化 JSON 缓存，
+使用 loadtest.py 中的固定数据 GitHub 后端
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip('markdown')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+import loadtest  # noqa: E402
+
+THREADS = 32
+
+# 用 Barrier 让所有线程同时开始调用 func，返回各线程的结果
+def run_concurrently(func, threads=THREADS):
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+    errors = []
+
+    def worker(i):
+        try:
+            barrier.wait()
+            results[i] = func(i)
+        except Exception as e:  # 线程内的异常带回主线程再断言
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert errors == []
+    return results
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    calls = []
+    calls_lock = threading.Lock()
+
+    # 记录请求并加入延迟，放大并发竞争的时间窗口
+    def counting_request(url, timeout=5, extra_headers=None):
+        with calls_lock:
+            calls.append(url)
+        return loadtest.fixture_github_request(url, timeout, extra_headers)
+
+    monkeypatch.setattr(loadtest, 'backend_latency', 0.005)
+    monkeypatch.setattr(app, 'make_github_request', counting_request)
+    # 预算足够大，第一次刷新就能索引全部仓库，之后的刷新结果保持一致
+    monkeypatch.setattr(app, 'config', {"github_url": "https://github.com/fixture-user",
+                                        "introduction_file": "Introduction.md",
+                                        "commit_scan_budget": 100})
+    monkeypatch.setattr(app, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(app, 'COMMIT_INDEX_DIR', str(tmp_path / 'commit_activity'))
+    monkeypatch.setattr(app, 'README_CACHE_DIR', str(tmp_path / 'readme'))
+    monkeypatch.setattr(app, 'cached_snapshots', {})
+    monkeypatch.setattr(app, 'cached_readmes', {})
+    monkeypatch.setattr(app, 'profile_json_cache', {})
+    monkeypatch.setattr(app, 'cached_tech_stack', None)
+    monkeypatch.setattr(app, 'cached_timestamp', 0)
+    return calls
+
+# 每次刷新都会且只会请求一次用户信息接口，用它统计 GitHub 扇出的次数
+def fan_outs(calls):
+    return sum(1 for url in calls if url.rstrip('/').endswith('/users/fixture-user'))
+
+def test_tech_stack_computed_once_per_expiry(backend):
+    repos = loadtest.fixture_repos('fixture-user')
+    results = run_concurrently(lambda i: app.analyze_tech_stack(repos))
+    languages_calls = [url for url in backend if url.endswith('/languages')]
+
+    assert all(result == results[0] for result in results)
+    # 一轮分析最多请求前10个仓库的语言数据，并发调用不应重复请求
+    assert 0 < len(languages_calls) <= 10
+
+    app.cached_timestamp = 0  # 让缓存过期
+    backend.clear()
+    run_concurrently(lambda i: app.analyze_tech_stack(repos))
+    assert 0 < len([url for url in backend if url.endswith('/languages')]) <= 10
+
+def test_cold_snapshot_fetched_once(backend):
+    snapshots = run_concurrently(lambda i: app.get_profile_snapshot())
+
+    assert fan_outs(backend) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    etags = {app.get_profile_json('fixture-user', snapshot, app.PROFILE_FIELDS)[0] for snapshot in snapshots}
+    assert len(etags) == 1
+
+def test_expired_snapshot_refreshed_once(backend):
+    stale = app.get_profile_snapshot()
+    stale.fetched_at = 1  # 让快照过期
+    backend.clear()
+
+    snapshots = run_concurrently(lambda i: app.get_profile_snapshot())
+
+    assert fan_outs(backend) == 1
+    # 调用方拿到的可能是旧快照或新快照，但内容和 ETag 必须一致
+    assert all(snapshot.to_dict() == stale.to_dict() for snapshot in snapshots)
+    etags = {app.get_profile_json('fixture-user', snapshot, app.PROFILE_FIELDS)[0] for snapshot in snapshots}
+    assert len(etags) == 1
+    assert app.get_profile_snapshot().fetched_at > 1
+
+def test_profile_json_consistent_under_concurrency(backend):
+    snapshot = app.get_profile_snapshot()
+    field_sets = [app.PROFILE_FIELDS, ('name', 'total_stars'), ('activity_data',), ('tech_stack', 'recent_repos')]
+
+    def serialize(i):
+        fields = field_sets[i % len(field_sets)]
+        # 一半线程使用新版本的快照，触发旧版本缓存的清理
+        if i % 2:
+            version = app.ProfileSnapshot.unpack(snapshot.pack())
+            version.fetched_at = snapshot.fetched_at + 1
+            return fields, app.get_profile_json('fixture-user', version, fields)
+        return fields, app.get_profile_json('fixture-user', snapshot, fields)
+
+    for _ in range(5):
+        results = run_concurrently(serialize)
+        etags = {}
+        for fields, (etag, body) in results:
+            assert etags.setdefault(fields, (etag, body)) == (etag, body)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+提交活动索引测试：预算限制、轮转扫描、增量跳过和大仓库的分页续扫
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+# 按仓库配置 stats/contributors 的状态码和提交列表的页数
+class FakeGitHub:
+    def __init__(self, stats_status=200, pages=None):
+        self.stats_status = stats_status
+        self.pages = pages or {}
+        self.calls = []
+        self.commit_date = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.week = app.week_start_timestamp(datetime.utcnow() - timedelta(days=1))
+
+    def request(self, url, timeout=5, extra_headers=None):
+        self.calls.append(url)
+        repo_name = url.split('/repos/fixture-user/', 1)[1].split('/', 1)[0]
+        if '/stats/contributors' in url:
+            if self.stats_status != 200:
+                return FakeResponse(self.stats_status)
+            return FakeResponse(200, [{"author": {"login": "fixture-user"},
+                                       "weeks": [{"w": self.week, "c": 3}]}])
+        page = int(url.split('&page=', 1)[1])
+        total_pages = self.pages.get(repo_name, 1)
+        count = 100 if page < total_pages else (50 if page == total_pages else 0)
+        return FakeResponse(200, [{"commit": {"author": {"date": self.commit_date}}}] * count)
+
+def make_repos(count=4, pushed_at='2026-01-01T00:00:00Z'):
+    return [{"name": f"repo-{i}", "pushed_at": pushed_at} for i in range(count)]
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    fake = FakeGitHub()
+    monkeypatch.setattr(app, 'make_github_request', fake.request)
+    monkeypatch.setattr(app, 'config', {"github_url": "https://github.com/fixture-user"})
+    monkeypatch.setattr(app, 'COMMIT_INDEX_DIR', str(tmp_path / 'commit_activity'))
+    return fake
+
+def total_commits(index, repo_name):
+    return sum(index['repos'][repo_name]['weeks'].values())
+
+def test_budget_and_round_robin(github):
+    repos = make_repos(4)
+
+    index = app.update_commit_index('fixture-user', repos, budget=2)
+    assert len(github.calls) == 2
+    assert sorted(index['repos']) == ['repo-0', 'repo-1']
+    assert index['cursor'] == 2
+
+    github.calls.clear()
+    index = app.update_commit_index('fixture-user', repos, budget=2)
+    assert len(github.calls) == 2
+    assert sorted(index['repos']) == ['repo-0', 'repo-1', 'repo-2', 'repo-3']
+
+    # 没有新推送的仓库不再请求
+    github.calls.clear()
+    app.update_commit_index('fixture-user', repos, budget=2)
+    assert github.calls == []
+
+def test_only_pushed_repos_rescanned(github):
+    repos = make_repos(3)
+    app.update_commit_index('fixture-user', repos, budget=10)
+    github.calls.clear()
+
+    repos[1]['pushed_at'] = '2026-02-01T00:00:00Z'
+    index = app.update_commit_index('fixture-user', repos, budget=10)
+    assert len(github.calls) == 1
+    assert 'repo-1' in github.calls[0]
+    assert index['repos']['repo-1']['pushed_at'] == '2026-02-01T00:00:00Z'
+
+def test_forks_skipped(github):
+    repos = make_repos(2) + [{"name": "forked", "pushed_at": "x", "fork": True}]
+    index = app.update_commit_index('fixture-user', repos, budget=10)
+    assert sorted(index['repos']) == ['repo-0', 'repo-1']
+
+def test_oversized_repo_resumes_paging(github):
+    # stats 不可用，repo-0 需要6页提交，预算每轮只有5次请求
+    github.stats_status = 422
+    github.pages = {'repo-0': 6}
+    repos = make_repos(4)
+
+    for _ in range(6):
+        index = app.update_commit_index('fixture-user', repos, budget=5)
+        if len(index['repos']) == 4:
+            break
+
+    assert sorted(index['repos']) == ['repo-0', 'repo-1', 'repo-2', 'repo-3']
+    assert index['pending'] == {}
+    # repo-0 的每一页只请求一次，计数既不丢失也不重复
+    repo0_pages = [url for url in github.calls if '/repos/fixture-user/repo-0/commits' in url]
+    assert len(repo0_pages) == len(set(repo0_pages)) == 6
+    assert total_commits(index, 'repo-0') == 550
+    assert total_commits(index, 'repo-1') == 50
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+导入开销预算测试：import app 不应加载 Flask 等重依赖，且耗时应保持在较低水平
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 冷启动时不允许出现的模块（dataclasses 会连带加载 inspect）
+HEAVY_MODULES = ['flask', 'requests', 'markdown', 'jinja2', 'yaml', 'dataclasses', 'inspect']
+# 导入耗时上限（秒），留有较大余量以免在慢机器上误报
+IMPORT_TIME_CEILING = 0.15
+
+# 在全新的子进程中导入 app，返回 (已加载的重模块, 导入耗时)
+def import_app_in_subprocess():
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "import app\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+        "print(json.dumps({'loaded': loaded, 'elapsed': elapsed}))\n"
+    )
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+    result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+    return result['loaded'], result['elapsed']
+
+def test_import_does_not_load_heavy_modules():
+    loaded, _ = import_app_in_subprocess()
+    assert loaded == []
+
+def test_import_time_within_budget():
+    # 取多次中的最小值，排除进程调度带来的抖动
+    elapsed = min(import_app_in_subprocess()[1] for _ in range(3))
+    assert elapsed < IMPORT_TIME_CEILING, f"import app 耗时 {elapsed * 1000:.1f}ms"
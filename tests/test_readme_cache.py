@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+README 缓存测试：ETag 条件请求、按 blob SHA 复用渲染结果、请求失败时使用缓存
+"""
+import os
+import sys
+import json
+import base64
+
+import pytest
+
+pytest.importorskip('markdown')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+def readme_response(text, sha, etag):
+    content = base64.b64encode(text.encode('utf-8')).decode('ascii')
+    return FakeResponse(200, {"path": "README.md", "sha": sha, "content": content}, {'ETag': etag})
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    state = {"responses": [], "requests": []}
+
+    def fake_request(url, timeout=5, extra_headers=None):
+        state["requests"].append(extra_headers)
+        return state["responses"].pop(0)
+
+    monkeypatch.setattr(app, 'make_github_request', fake_request)
+    monkeypatch.setattr(app, 'config', {"introduction_file": str(tmp_path / 'missing.md')})
+    monkeypatch.setattr(app, 'README_CACHE_DIR', str(tmp_path / 'readme'))
+    monkeypatch.setattr(app, 'cached_readmes', {})
+    return state
+
+def count_renders(monkeypatch):
+    renders = []
+    original = app.render_markdown
+
+    def counting_render(text):
+        renders.append(text)
+        return original(text)
+
+    monkeypatch.setattr(app, 'render_markdown', counting_render)
+    return renders
+
+def test_not_modified_uses_cache(github, monkeypatch):
+    renders = count_renders(monkeypatch)
+    github["responses"] = [readme_response("# Hello", "sha-1", '"etag-1"'), FakeResponse(304)]
+
+    first = app.get_readme_content('fixture-user')
+    app.cached_readmes.clear()  # 第二次从磁盘读取缓存
+    second = app.get_readme_content('fixture-user')
+
+    assert first == second == '<h1>Hello</h1>'
+    assert github["requests"] == [None, {'If-None-Match': '"etag-1"'}]
+    assert len(renders) == 1
+
+def test_same_sha_reuses_rendered_html(github, monkeypatch):
+    renders = count_renders(monkeypatch)
+    github["responses"] = [readme_response("# Hello", "sha-1", '"etag-1"'),
+                           readme_response("# Hello", "sha-1", '"etag-2"')]
+
+    app.get_readme_content('fixture-user')
+    assert app.get_readme_content('fixture-user') == '<h1>Hello</h1>'
+    assert len(renders) == 1
+    assert app.load_readme_cache('fixture-user')['etag'] == '"etag-2"'
+
+def test_changed_sha_rerenders(github, monkeypatch):
+    github["responses"] = [readme_response("# Hello", "sha-1", '"etag-1"'),
+                           readme_response("# Bye", "sha-2", '"etag-2"')]
+
+    app.get_readme_content('fixture-user')
+    assert app.get_readme_content('fixture-user') == '<h1>Bye</h1>'
+
+def test_server_error_serves_cache(github):
+    github["responses"] = [readme_response("# Hello", "sha-1", '"etag-1"'), FakeResponse(500)]
+
+    app.get_readme_content('fixture-user')
+    assert app.get_readme_content('fixture-user') == '<h1>Hello</h1>'
+
+def test_not_found_falls_back_to_local_readme(github):
+    github["responses"] = [readme_response("# Hello", "sha-1", '"etag-1"'), FakeResponse(404)]
+
+    app.get_readme_content('fixture-user')
+    assert app.get_readme_content('fixture-user') == app.get_local_readme()
+
+def test_invalid_disk_cache_ignored(github):
+    os.makedirs(app.README_CACHE_DIR)
+    with open(app.readme_cache_path('fixture-user'), 'w', encoding='utf-8') as f:
+        json.dump({"etag": '"etag-1"', "sha": "sha-1"}, f)  # 缺少 html
+    github["responses"] = [FakeResponse(500)]
+
+    assert app.load_readme_cache('fixture-user') is None
+    assert app.get_readme_content('fixture-user') == app.get_local_readme()
+    assert github["requests"] == [None]
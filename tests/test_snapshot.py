@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+资料快照测试：紧凑格式的往返转换，以及列表字段在模板中的渲染
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+def make_snapshot():
+    return app.ProfileSnapshot(
+        avatar_url="https://avatars.githubusercontent.com/u/0?v=4",
+        name="fixture",
+        bio="bio",
+        total_repos=1,
+        total_stars=3,
+        readme_content="<p>readme</p>",
+        recent_repos=[app.RepoSummary.from_github({"name": "repo", "stargazers_count": 3, "extra": "ignored"})],
+        activity_data=[10, 7, 7, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        tech_stack=app.make_tech_stack([{"name": "Python", "color": "#333333"}]),
+        fetched_at=1000.0
+    )
+
+def test_pack_round_trip():
+    snapshot = make_snapshot()
+    restored = app.ProfileSnapshot.unpack(snapshot.pack())
+    assert restored == snapshot
+    assert isinstance(restored.activity_data, list)
+    assert isinstance(restored.recent_repos, list)
+    assert isinstance(restored.tech_stack, list)
+
+def test_unpack_rejects_other_versions():
+    row = make_snapshot().pack()
+    row[0] = app.SNAPSHOT_VERSION + 1
+    assert app.ProfileSnapshot.unpack(row) is None
+
+def test_activity_data_renders_as_js_array():
+    jinja2 = pytest.importorskip('jinja2')
+    template = jinja2.Template("const activityData = {{ github_info.activity_data }};")
+    rendered = template.render(github_info=app.ProfileSnapshot.unpack(make_snapshot().pack()))
+    assert rendered == "const activityData = [10, 7, 7, 0, 0, 0, 0, 0, 0, 0, 0, 0];"